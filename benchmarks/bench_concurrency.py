@@ -0,0 +1,59 @@
+"""
+Benchmark sequential vs. concurrent chunk fetching in gTTS.stream()
+
+Serves a local stub of the TTS API with a fixed per-request latency and
+reports the wall time to synthesize texts of increasing chunk counts.
+
+Usage: PYTHONPATH=vendor python benchmarks/bench_concurrency.py
+"""
+
+import argparse
+import time
+
+from gtts import gTTS
+from gtts.tests.stub_server import StubServer
+
+
+def make_text(chunks: int) -> str:
+    """Text that tokenizes into exactly ``chunks`` chunks"""
+    return ' '.join(
+        f'This is sentence number {i} of the benchmark document padded a bit.' for i in range(chunks)
+    )
+
+
+def time_stream(text: str, max_in_flight: int) -> float:
+    tts = gTTS(text=text, lang_check=False, max_in_flight=max_in_flight)
+    start = time.perf_counter()
+    for _ in tts.stream():
+        pass
+    return time.perf_counter() - start
+
+
+def run(chunk_counts=(1, 5, 10, 30, 60), in_flight=(1, 4, 8), latency=0.05):
+    """Return {max_in_flight: {chunks: seconds}}"""
+    results = {n: {} for n in in_flight}
+    with StubServer(latency=latency) as stub, stub.patch():
+        for chunks in chunk_counts:
+            text = make_text(chunks)
+            for n in in_flight:
+                results[n][chunks] = time_stream(text, n)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request (s)')
+    parser.add_argument('--chunks', type=int, nargs='+', default=[1, 5, 10, 30, 60])
+    parser.add_argument('--in-flight', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    results = run(args.chunks, args.in_flight, args.latency)
+
+    print(f'stub latency: {args.latency * 1000:.0f} ms/request')
+    print('chunks ' + ''.join(f'{f"in_flight={n}":>14}' for n in args.in_flight))
+    for chunks in args.chunks:
+        print(f'{chunks:>6} ' + ''.join(f'{results[n][chunks]:>13.3f}s' for n in args.in_flight))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Measure decoding of TTS API audio payloads: throughput and peak memory
+
+Compares the incremental byte-level decoder used by gTTS.stream()
+(gtts.payload.AudioPayloadDecoder over iter_content) with the previous
+line-based decoding (iter_lines, str decode, regex, b64decode).
+
+Sample responses are recorded from the local stub, carrying a real MP3
+(temp.mp3 by default) repeated to each payload size. Throughput is measured
+end to end against the stub; peak memory (tracemalloc) on the recorded
+bodies alone, so the stub's own allocations don't count.
+
+Usage: PYTHONPATH=vendor python benchmarks/bench_decode.py [--sample temp.mp3]
+"""
+
+import argparse
+import base64
+import io
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+import requests
+
+from gtts import gTTS
+from gtts.payload import AudioPayloadDecoder
+from gtts.tests.stub_server import StubServer
+
+CHUNK_SIZE = 8192
+BODY = gTTS('sample', lang_check=False).get_bodies()[0]
+SIZES = {'14KB': 14 * 1024, '256KB': 256 * 1024, '4MB': 4 * 1024 * 1024}
+DEFAULT_SAMPLE = Path(__file__).resolve().parent.parent / 'temp.mp3'
+
+
+def decode_lines(lines) -> bytes:
+    """The previous decoding, from gTTS._fetch"""
+    audio = []
+    for line in lines:
+        decoded_line = line.decode('utf-8')
+        if 'jQ1olc' in decoded_line:
+            audio_search = re.search(r'jQ1olc","\[\\"(.*)\\"]', decoded_line)
+            as_bytes = audio_search.group(1).encode('ascii')
+            audio.append(base64.b64decode(as_bytes))
+    return b''.join(audio)
+
+
+def decode_incremental(pieces) -> bytes:
+    out = io.BytesIO()
+    decoder = AudioPayloadDecoder(out)
+    for data in pieces:
+        decoder.feed(data)
+    decoder.close()
+    return out.getvalue()
+
+
+def iter_pieces(body: bytes):
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i:i + CHUNK_SIZE]
+
+
+def fetch(session: requests.Session, url: str, incremental: bool) -> bytes:
+    if incremental:
+        r = session.post(url, data=BODY, stream=True)
+        return decode_incremental(r.iter_content(chunk_size=CHUNK_SIZE))
+    r = session.post(url, data=BODY)
+    return decode_lines(r.iter_lines(chunk_size=1024))
+
+
+def throughput(stub: StubServer, incremental: bool, repeat: int) -> float:
+    """Audio bytes decoded per second, end to end"""
+    url = stub.translate_url(path='_/TranslateWebserverUi/data/batchexecute')
+    session = requests.Session()
+    session.trust_env = False
+    decoded = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decoded += len(fetch(session, url, incremental))
+    return decoded / (time.perf_counter() - start)
+
+
+def peak_memory(body: bytes, incremental: bool) -> int:
+    """Peak bytes allocated while decoding a recorded body"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    if incremental:
+        decode_incremental(iter_pieces(body))
+    else:
+        # As iter_lines hands them out, line by line
+        decode_lines(io.BytesIO(body))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(sample=DEFAULT_SAMPLE, repeat=20):
+    """Return {size: {'lines'|'incremental': {'bytes_per_s': x, 'peak_bytes': y}}}"""
+    mp3 = Path(sample).read_bytes()
+    results = {}
+    for name, size in SIZES.items():
+        audio = (mp3 * (size // len(mp3) + 1))[:size]
+        with StubServer(audio=lambda text: audio) as stub:
+            body = stub.response_for('sample')
+            assert decode_lines(io.BytesIO(body)) == decode_incremental(iter_pieces(body)) == audio
+            results[name] = {
+                method: {
+                    'bytes_per_s': throughput(stub, method == 'incremental', max(repeat * 14 * 1024 // size, 3)),
+                    'peak_bytes': peak_memory(body, method == 'incremental'),
+                }
+                for method in ('lines', 'incremental')
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sample', default=DEFAULT_SAMPLE, help='MP3 to carry in the responses')
+    parser.add_argument('--repeat', type=int, default=20, help='Requests per method for the smallest size')
+    args = parser.parse_args()
+
+    results = run(args.sample, args.repeat)
+    print(f"{'payload':>7} {'method':>12} {'MB/s':>8} {'peak memory':>12}")
+    for name, methods in results.items():
+        for method, r in methods.items():
+            print(f"{name:>7} {method:>12} {r['bytes_per_s'] / 1e6:>8.1f} {r['peak_bytes'] / 1024:>10.0f}KB")
+
+
+if __name__ == '__main__':
+    main()
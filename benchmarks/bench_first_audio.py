@@ -0,0 +1,68 @@
+"""
+Measure time-to-first-audio of streaming playback against a local stub
+
+TTSWorker emits each MP3 segment as gTTS.stream() yields it, and playback
+starts on the first one. This compares the time until that first segment
+with the time until the whole file is saved (when playback used to start).
+
+Usage: PYTHONPATH=vendor python benchmarks/bench_first_audio.py
+"""
+
+import argparse
+import io
+import time
+
+from gtts import gTTS
+from gtts.session import SessionPool
+from gtts.tests.stub_server import StubServer
+
+# 10 chunks
+TEXT = ' '.join(f'This is sentence number {i} of the benchmark document padded a bit.' for i in range(10))
+
+
+def time_first_audio(max_in_flight: int):
+    """Return (seconds to first segment, seconds to last segment)"""
+    tts = gTTS(text=TEXT, lang_check=False, max_in_flight=max_in_flight,
+               session_pool=SessionPool(proxies={}))
+    start = time.perf_counter()
+    first = None
+    for _ in tts.stream():
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def time_save(max_in_flight: int) -> float:
+    tts = gTTS(text=TEXT, lang_check=False, max_in_flight=max_in_flight,
+               session_pool=SessionPool(proxies={}))
+    start = time.perf_counter()
+    tts.write_to_fp(io.BytesIO())
+    return time.perf_counter() - start
+
+
+def run(latency=0.2, in_flight=(1, 4)):
+    """Return {max_in_flight: {'first_audio': s, 'all_audio': s, 'save': s}}"""
+    results = {}
+    with StubServer(latency=latency) as stub, stub.patch():
+        for n in in_flight:
+            first, last = time_first_audio(n)
+            results[n] = {'first_audio': first, 'all_audio': last, 'save': time_save(n)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2, help='Stub latency per request (s)')
+    parser.add_argument('--in-flight', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    results = run(args.latency, args.in_flight)
+
+    print(f'10 chunks, stub latency: {args.latency * 1000:.0f} ms/request')
+    print(f"{'in_flight':>9} {'first audio':>12} {'all audio':>10} {'save, then play':>16}")
+    for n, r in results.items():
+        print(f"{n:>9} {r['first_audio']:>11.3f}s {r['all_audio']:>9.3f}s {r['save']:>15.3f}s")
+
+
+if __name__ == '__main__':
+    main()
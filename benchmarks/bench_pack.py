@@ -0,0 +1,79 @@
+"""
+Benchmark request count and wall time of gTTS with and without chunk packing
+
+Synthesizes a small corpus through a local stub of the TTS API, with a
+fixed per-request latency, once with one request per token (the default)
+and once with adjacent tokens packed into chunks of up to 100 characters
+(pack=True, what the GUI uses).
+
+Usage: PYTHONPATH=vendor python benchmarks/bench_pack.py
+"""
+
+import argparse
+import time
+
+from gtts import gTTS
+from gtts.tests.stub_server import StubServer
+
+CORPUS = {
+    'comma-heavy': ' '.join(
+        ['Yes, well, so, then, anyway, you know, right, okay, fine, sure.'] * 8
+    ),
+    'dialogue': ' '.join(
+        ['"Ready?" she asked. "Yes!" Good: then go; now, quickly, quietly.'] * 8
+    ),
+    'list': 'Ingredients: ' + ', '.join(
+        ['flour', 'sugar', 'two eggs', 'butter', 'milk', 'salt', 'a lemon', 'vanilla'] * 6
+    ) + '.',
+    'prose': ' '.join(
+        ['The quick brown fox jumps over the lazy dog near the river bank at dawn.'] * 8
+    ),
+}
+
+
+def time_stream(text: str, pack: bool, max_in_flight: int, stub: StubServer) -> tuple:
+    """(requests, seconds) to synthesize ``text``"""
+    sent = len(stub.requests)
+    tts = gTTS(text=text, lang_check=False, pack=pack, max_in_flight=max_in_flight)
+    start = time.perf_counter()
+    for _ in tts.stream():
+        pass
+    return len(stub.requests) - sent, time.perf_counter() - start
+
+
+def run(latency=0.05, max_in_flight=1):
+    """Return {text name: {'tokens' | 'packed': {'requests': n, 'seconds': s}}}"""
+    results = {}
+    with StubServer(latency=latency) as stub, stub.patch():
+        for name, text in CORPUS.items():
+            results[name] = {}
+            for label, pack in (('tokens', False), ('packed', True)):
+                requests, seconds = time_stream(text, pack, max_in_flight, stub)
+                results[name][label] = {'requests': requests, 'seconds': seconds}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request (s)')
+    parser.add_argument('--in-flight', type=int, default=1, help='max_in_flight of gTTS')
+    args = parser.parse_args()
+
+    results = run(args.latency, args.in_flight)
+
+    print(f'stub latency: {args.latency * 1000:.0f} ms/request, max_in_flight={args.in_flight}')
+    print(f"{'text':<12} {'chars':>6} {'requests':>14} {'wall time':>20}")
+    totals = {'tokens': [0, 0.0], 'packed': [0, 0.0]}
+    for name, r in results.items():
+        for label in totals:
+            totals[label][0] += r[label]['requests']
+            totals[label][1] += r[label]['seconds']
+        print(f"{name:<12} {len(CORPUS[name]):>6} "
+              f"{r['tokens']['requests']:>6} -> {r['packed']['requests']:<4} "
+              f"{r['tokens']['seconds']:>8.3f}s -> {r['packed']['seconds']:.3f}s")
+    print(f"{'total':<12} {'':>6} {totals['tokens'][0]:>6} -> {totals['packed'][0]:<4} "
+          f"{totals['tokens'][1]:>8.3f}s -> {totals['packed'][1]:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
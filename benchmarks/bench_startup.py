@@ -0,0 +1,164 @@
+"""
+Measure cold start: import time and time to first paint of the GUI
+
+Each measurement runs in a fresh interpreter, like a launch:
+  - import: importing what main.py loads before the window shows
+    (gtts.lang), and, for reference, the gTTS engine and pygame that are
+    now loaded after the first paint
+  - first_paint: from process start to the first paint of MainWindow, on
+    Qt's offscreen platform (needs PyQt5)
+
+The medians are checked against startup_budget.json with --check, which
+exits with status 1 when a number goes over its budget, or could not be
+measured (e.g. PyQt5 missing) unless --allow-unmeasured is given.
+
+Usage: PYTHONPATH=vendor python benchmarks/bench_startup.py [--check]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET = Path(__file__).resolve().parent / 'startup_budget.json'
+
+IMPORTS = {
+    'gtts.lang': 'import gtts.lang',
+    'gtts engine': 'from gtts import gTTS',
+    'pygame': 'import pygame',
+}
+
+# Prints 'painted' on the first paint of the main window
+FIRST_PAINT = '''
+import gettext
+gettext.install('messages')
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+import main
+
+class OnPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print('painted', flush=True)
+            import os
+            os._exit(0)
+        return False
+
+app = QApplication([])
+window = main.MainWindow()
+on_paint = OnPaint()
+window.installEventFilter(on_paint)
+window.show()
+app.exec()
+'''
+
+
+def child_env(extra_path=()) -> dict:
+    env = dict(os.environ)
+    inherited = [env['PYTHONPATH']] if env.get('PYTHONPATH') else []
+    env['PYTHONPATH'] = os.pathsep.join([str(ROOT), str(ROOT / 'vendor'), *extra_path, *inherited])
+    env['QT_QPA_PLATFORM'] = 'offscreen'
+    env['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    return env
+
+
+def time_import(statement: str) -> float:
+    """Seconds to run ``statement`` in a fresh interpreter, minus its startup"""
+    code = f'import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)'
+    out = subprocess.run([sys.executable, '-c', code], env=child_env(),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def time_first_paint(lib_dir: str) -> float:
+    """Seconds from launching the GUI to its first paint"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', FIRST_PAINT], env=child_env([lib_dir]),
+                            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    # main.py prints other things first (e.g. the language it detected)
+    painted = any(line.strip() == 'painted' for line in proc.stdout)
+    elapsed = time.perf_counter() - start
+    proc.kill()
+    _, err = proc.communicate()
+    if not painted:
+        raise RuntimeError(err.strip().splitlines()[-1] if err.strip() else 'no paint')
+    return elapsed
+
+
+def median(func, repeat: int, *args):
+    return statistics.median(func(*args) for _ in range(repeat))
+
+
+def run(repeat=5):
+    """Return {'import_ms': {name: ms or None}, 'first_paint_ms': ms or None}"""
+    results = {'import_ms': {}, 'first_paint_ms': None}
+    for name, statement in IMPORTS.items():
+        try:
+            results['import_ms'][name] = median(time_import, repeat, statement) * 1000
+        except subprocess.CalledProcessError:
+            results['import_ms'][name] = None
+
+    # main.py imports about_dialog from the gtts_gui package it is installed with
+    with tempfile.TemporaryDirectory() as lib_dir:
+        package = Path(lib_dir) / 'gtts_gui'
+        package.mkdir()
+        (package / '__init__.py').touch()
+        (package / 'about_dialog.py').symlink_to(ROOT / 'about_dialog.py')
+        try:
+            results['first_paint_ms'] = median(time_first_paint, repeat, lib_dir) * 1000
+        except RuntimeError as e:
+            print(f'first paint not measured: {e}', file=sys.stderr)
+    return results
+
+
+def over_budget(results: dict, budget: dict) -> tuple:
+    """(measurements over their budget, budgeted measurements missing)"""
+    checks = [(f'import {name}', results['import_ms'].get(name), limit)
+              for name, limit in budget['import_ms'].items()]
+    checks.append(('first paint', results['first_paint_ms'], budget['first_paint_ms']))
+
+    over, missing = [], []
+    for name, value, limit in checks:
+        if value is None:
+            missing.append(f'{name} (budget {limit}ms)')
+        elif value > limit:
+            over.append(f'{name}: {value:.0f}ms > {limit}ms')
+    return over, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Launches per measurement (median)')
+    parser.add_argument('--check', action='store_true', help=f'Fail when over {BUDGET.name}')
+    parser.add_argument('--allow-unmeasured', action='store_true',
+                        help='With --check, only warn about budgeted numbers that could not be measured')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    budget = json.loads(BUDGET.read_text())
+
+    def fmt(ms):
+        return 'n/a' if ms is None else f'{ms:.0f}ms'
+
+    for name, ms in results['import_ms'].items():
+        limit = budget['import_ms'].get(name)
+        print(f"{'import ' + name:<20} {fmt(ms):>8}" + (f'  (budget {limit}ms)' if limit else ''))
+    print(f"{'first paint':<20} {fmt(results['first_paint_ms']):>8}  (budget {budget['first_paint_ms']}ms)")
+
+    if args.check:
+        over, missing = over_budget(results, budget)
+        for line in over:
+            print(f'OVER BUDGET: {line}', file=sys.stderr)
+        for line in missing:
+            print(f'NOT MEASURED: {line}', file=sys.stderr)
+        sys.exit(1 if over or (missing and not args.allow_unmeasured) else 0)
+
+
+if __name__ == '__main__':
+    main()
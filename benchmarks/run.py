@@ -0,0 +1,232 @@
+"""
+Run the end-to-end benchmark suite and store its results as JSON
+
+Scenarios, all against a local stub of the TTS API (gtts.tests.stub_server)
+with configurable latency, jitter, error rate and payload size:
+  - tokenize: throughput of gTTS._tokenize (no network, see bench_tokenize)
+  - single_document: wall time of one document, sequential and concurrent
+  - many_documents: throughput of gtts.batch.run_batch over many documents
+  - first_audio: time to the first and last segment of a generation of the
+    GUI's worker (an IncrementalSession set up like TTSWorker.new_session),
+    and of a regeneration after a one-word edit
+
+Results go to benchmarks/results/<commit>.json (with -dirty for a modified
+tree). Compare two runs with --compare: timings ('_s') going up or rates
+('_per_s') going down by more than --threshold are reported as regressions,
+and make the run exit with status 1.
+
+Usage:
+  PYTHONPATH=vendor python benchmarks/run.py [--scenarios ...] [--compare old.json]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bench_concurrency
+import bench_tokenize
+from gtts import gTTS
+from gtts.batch import BatchJob, run_batch
+from gtts.incremental import IncrementalSession
+from gtts.retry import RetryPolicy
+from gtts.session import SessionPool
+from gtts.tests.stub_server import StubServer
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).resolve().parent / 'results'
+
+# TTSWorker's settings (main.py needs PyQt5, which benchmarks don't)
+GUI_MAX_IN_FLIGHT = 4
+GUI_PACK = True
+
+
+def retry_policy():
+    """Retries, so that stub errors (--error-rate) cost time, not the run"""
+    return RetryPolicy(max_attempts=5, backoff=0.01, max_backoff=0.1)
+
+
+def median_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def scenario_tokenize(stub: StubServer, repeat: int) -> dict:
+    results = bench_tokenize.run(('1KB', '100KB'))
+    return {f'{name}_mb_per_s': bench_tokenize.SIZES[name] / seconds / 1e6
+            for name, seconds in results.items()}
+
+
+def scenario_single_document(stub: StubServer, repeat: int, chunks=30) -> dict:
+    text = bench_concurrency.make_text(chunks)
+    pool = SessionPool(proxies={})
+    results = {'chunks': chunks}
+    for n in (1, 4):
+        def synthesize():
+            tts = gTTS(text=text, lang_check=False, max_in_flight=n,
+                       session_pool=pool, retry=retry_policy())
+            for _ in tts.stream():
+                pass
+        results[f'in_flight_{n}_s'] = median_time(synthesize, repeat)
+    return results
+
+
+def scenario_many_documents(stub: StubServer, repeat: int, documents=40) -> dict:
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as out:
+            jobs = [BatchJob(text=bench_concurrency.make_text(3 + i % 5),
+                             output=Path(out) / f'{i}.mp3')
+                    for i in range(documents)]
+            runs.append(run_batch(jobs, max_workers=4, lang_check=False,
+                                  session_pool=SessionPool(pool_size=4, proxies={}),
+                                  retry=retry_policy()))
+    return {
+        'documents': documents,
+        'files_per_s': statistics.median(s.files_per_s for s in runs),
+        'chunks_per_s': statistics.median(s.chunks_per_s for s in runs),
+        'chunk_latency_p95_s': statistics.median(s.latency_percentile(95) for s in runs),
+        'failed': max(len(s.failed) for s in runs),
+    }
+
+
+def scenario_first_audio(stub: StubServer, repeat: int) -> dict:
+    text = '\n\n'.join(bench_concurrency.make_text(10) for _ in range(5))
+    edited = text.replace('sentence number 3 ', 'sentence number three ', 1)
+    timings = {'first_audio_s': [], 'all_audio_s': [], 'edit_all_audio_s': []}
+
+    def stream(session, text):
+        start = time.perf_counter()
+        first = None
+        for _ in session.stream(text):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    for _ in range(repeat):
+        session = IncrementalSession(lang_check=False, pack=GUI_PACK,
+                                     max_in_flight=GUI_MAX_IN_FLIGHT,
+                                     session_pool=SessionPool(pool_size=GUI_MAX_IN_FLIGHT,
+                                                              proxies={}),
+                                     retry=retry_policy())
+        first, last = stream(session, text)
+        timings['first_audio_s'].append(first)
+        timings['all_audio_s'].append(last)
+        timings['edit_all_audio_s'].append(stream(session, edited)[1])
+
+    results = {name: statistics.median(values) for name, values in timings.items()}
+    results['edit_requests'] = session.requested
+    return results
+
+
+SCENARIOS = {
+    'tokenize': scenario_tokenize,
+    'single_document': scenario_single_document,
+    'many_documents': scenario_many_documents,
+    'first_audio': scenario_first_audio,
+}
+
+
+def git_commit() -> str:
+    """Short hash of HEAD, with -dirty if the tree has changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty.strip() else '')
+
+
+def run(scenarios=tuple(SCENARIOS), latency=0.02, jitter=0.01, error_rate=0.0,
+        payload_size=16 * 1024, seed=0, repeat=3):
+    """Return the results of ``scenarios``: {scenario: {metric: value}}, with the run's settings"""
+    stub_settings = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate,
+                     'payload_size': payload_size, 'seed': seed}
+    results = {}
+    with StubServer(**stub_settings) as stub, stub.patch():
+        for name in scenarios:
+            print(f'running {name}...', file=sys.stderr)
+            results[name] = SCENARIOS[name](stub, repeat)
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'stub': stub_settings,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """(scenario, metric, old, new, change, regressed) of the metrics in both"""
+    rows = []
+    for scenario, metrics in new['results'].items():
+        for metric, value in metrics.items():
+            before = old['results'].get(scenario, {}).get(metric)
+            if before is None:
+                continue
+            change = (value - before) / before if before else 0.0
+            if metric.endswith('_per_s'):
+                regressed = change < -threshold
+            elif metric.endswith('_s'):
+                regressed = change > threshold
+            else:
+                regressed = False
+            rows.append((scenario, metric, before, value, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub latency per request (s)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Stub random extra latency, up to (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failed by the stub')
+    parser.add_argument('--payload-size', type=int, default=16 * 1024, help='Audio bytes per response')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the stub jitter and errors')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median)')
+    parser.add_argument('--output', type=Path, help='JSON file to write (default: results/<commit>.json)')
+    parser.add_argument('--compare', type=Path, metavar='OLD_JSON', help='Results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative change reported as a regression')
+    args = parser.parse_args()
+
+    report = run(args.scenarios, args.latency, args.jitter, args.error_rate,
+                 args.payload_size, args.seed, args.repeat)
+
+    output = args.output or RESULTS / f"{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + '\n')
+
+    for scenario, metrics in report['results'].items():
+        print(scenario)
+        for metric, value in metrics.items():
+            print(f'  {metric:<22} {value:>12.4g}')
+    print(f'results written to {output}')
+
+    if args.compare:
+        old = json.loads(args.compare.read_text())
+        if old['stub'] != report['stub']:
+            print(f"warning: stub settings differ from {args.compare}: {old['stub']}", file=sys.stderr)
+        rows = compare(old, report, args.threshold)
+        print(f"\ncompared with {old['commit']} ({args.compare})")
+        for scenario, metric, before, value, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f'  {scenario + "." + metric:<40} {before:>10.4g} -> {value:<10.4g} {change:>+7.1%}{flag}')
+        sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
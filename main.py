@@ -3,10 +3,15 @@ Google Text-to-Speech GUI Application
 Using PyQt5 and gTTS
 """
 
+import shutil
 import sys
+import tempfile
+import threading
+from collections import deque
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Optional
-import pygame
+from typing import BinaryIO, Deque, Optional
 import gettext
 import os
 import locale
@@ -14,32 +19,189 @@ import locale
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QComboBox, QTextEdit, QPushButton, QFileDialog, QProgressBar,
-    QLabel, QMessageBox
+    QLabel, QMessageBox, QPlainTextEdit
 )
 from gtts_gui.about_dialog import AboutDialog
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QIcon
-from gtts import gTTS
 import gtts.lang
+from gtts.metrics import Metrics
+
+# pygame (SDL) and the gTTS engine (requests) are slow to import: they are
+# loaded on first use, or in the background once the window is painted
+# (see MainWindow.warm_up)
+_mixer = None
+_mixer_lock = threading.Lock()
+
+
+def audio_mixer():
+    """pygame's mixer, imported and initialized on first use (from any thread)"""
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+            import pygame
+            pygame.mixer.init()
+            _mixer = pygame.mixer
+    return _mixer
+
+
+def load_engines():
+    """Load the gTTS engine and the audio mixer, off the GUI thread"""
+    TTSWorker.load_engine()
+    audio_mixer()
+
+
+# Language-specific domain (accent) mappings
+LANG_DOMAINS = {
+    'en': {  # English
+        'United States': 'us',
+        'United Kingdom': 'co.uk',
+        'Australia': 'com.au',
+        'Canada': 'ca',
+        'India': 'co.in',
+        'Ireland': 'ie',
+        'South Africa': 'co.za',
+        'Nigeria': 'com.ng'
+    },
+    'es': {  # Spanish
+        'Spain': 'es',
+        'Mexico': 'com.mx',
+        'United States': 'us'
+    },
+    'fr': {  # French
+        'France': 'fr',
+        'Canada': 'ca'
+    },
+    'pt': {  # Portuguese
+        'Portugal': 'pt',
+        'Brazil': 'com.br'
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def language_items():
+    """(display name, code) of each language, sorted by display name"""
+    names = {code: f"{code} ({name})" for code, name in gtts.lang.lang_index().items()}
+    # Modify Catalan to Catalan-Valencian
+    if 'ca' in names:
+        names['ca'] = 'ca (Catalan-Valencian)'
+    return tuple(sorted((name, code) for code, name in names.items()))
+
 
 class TTSWorker(QThread):
-    finished = pyqtSignal(str)
+    # The job's audio, in a buffer of its own (see SPOOL_MAX_SIZE)
+    finished = pyqtSignal(object)
     error = pyqtSignal(str)
+    # MP3 audio of each chunk, in order, as soon as it is downloaded
+    segment_ready = pyqtSignal(bytes)
+    # Chunks completed, total chunks, audio bytes received, chunk latency (s)
+    progress = pyqtSignal(int, int, int, float)
+    cancelled = pyqtSignal()
+
+    # Chunk requests sent to the TTS API at the same time
+    MAX_IN_FLIGHT = 4
     
-    def __init__(self, text: str, lang: str, tld: str):
+    # Merge short phrases into chunks of up to 100 characters: fewer
+    # requests (round trips) for the same text
+    PACK = True
+
+    # Audio is kept in memory up to this size, then spills to a private
+    # temporary file (in the system temp directory, not the working one)
+    SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+    # Shared by every generation, set up by load_engine():
+    # keep-alive connections,
+    SESSION_POOL = None
+    # audio of already synthesized chunks (see CACHE.stats() for the hit rate),
+    # kept in the local, per-user runtime directory (usually a tmpfs) rather
+    # than the home directory, which may be on a slow network share. None
+    # without XDG_RUNTIME_DIR: edits are still reused in memory (new_session)
+    CACHE = None
+    CACHE_MAX_SIZE = 32 * 1024 * 1024
+    # and retries of chunks that fail transiently, instead of losing the
+    # whole text. No failover: the user picked the accent (tld)
+    RETRY = None
+    _engine_lock = threading.Lock()
+
+    @classmethod
+    def load_engine(cls):
+        """Import gTTS and set up what generations share, once"""
+        with cls._engine_lock:
+            if cls.SESSION_POOL is not None:
+                return
+            from gtts.cache import AudioCache
+            from gtts.retry import RetryPolicy
+            from gtts.session import SessionPool
+            runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+            if runtime_dir:
+                cls.CACHE = AudioCache(Path(runtime_dir) / 'gtts' / 'cache',
+                                       max_size=cls.CACHE_MAX_SIZE)
+            cls.RETRY = RetryPolicy()
+            cls.SESSION_POOL = SessionPool(pool_size=cls.MAX_IN_FLIGHT)
+    
+    def __init__(self, text: str, lang: str, tld: str, session=None):
         super().__init__()
         self.text = text
         self.lang = lang
         self.tld = tld
+        # Audio of the previous generation of the same lang and tld, to
+        # request only the chunks edited since (see new_session)
+        self.session = session
+        self.cancel_event = threading.Event()
+        # Timings of this generation, for the debug panel
+        self.metrics = Metrics()
+        
+    def cancel(self):
+        """Stop the synthesis, from any thread"""
+        self.cancel_event.set()
         
     def run(self):
+        audio = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE,
+                                              suffix='.mp3')
         try:
-            temp_file = Path('temp.mp3')
-            tts = gTTS(text=self.text, lang=self.lang, tld=self.tld)
-            tts.save(str(temp_file))
-            self.finished.emit(str(temp_file))
+            # Setting up can fail too (e.g. the engine's imports): report it
+            self.load_engine()
+            if self.session is None:
+                self.session = self.new_session()
+            for segment in self.segments():
+                audio.write(segment)
+                self.segment_ready.emit(segment)
+            self.finished.emit(audio)
         except Exception as e:
-            self.error.emit(str(e))
+            # Don't keep partial audio
+            audio.close()
+            # gTTSCancelled, without importing gtts if that's what failed
+            if self.cancel_event.is_set():
+                self.cancelled.emit()
+            else:
+                self.error.emit(str(e))
+            
+    def new_session(self):
+        """Incremental synthesis of self.lang and self.tld, from scratch"""
+        from gtts import daemon
+        from gtts.incremental import IncrementalSession
+        # Through the local daemon if it runs (ahead of its batch jobs),
+        # or gTTS
+        return IncrementalSession(use_daemon=True, priority=daemon.INTERACTIVE,
+                                  lang=self.lang, tld=self.tld,
+                                  pack=self.PACK,
+                                  max_in_flight=self.MAX_IN_FLIGHT,
+                                  session_pool=self.SESSION_POOL,
+                                  cache=self.CACHE,
+                                  retry=self.RETRY)
+        
+    def segments(self):
+        """Stream the audio, requesting only the chunks that changed"""
+        return self.session.stream(self.text,
+                                   progress_callback=self.emit_progress,
+                                   cancel_event=self.cancel_event,
+                                   metrics=self.metrics)
+            
+    def emit_progress(self, progress):
+        self.progress.emit(progress.completed, progress.total,
+                           progress.bytes_received, progress.latency)
 
 def setup_translations():
     # Get the system language
@@ -78,17 +240,25 @@ class MainWindow(QMainWindow):
         # Set window icon
         self.setWindowIcon(QIcon('/usr/share/icons/hicolor/scalable/apps/gtts-gui.svg'))
         
-        # Initialize pygame mixer for audio playback
-        pygame.mixer.init()
+        # Audio playback and the gTTS engine are loaded after the first paint
+        self.warmed_up = False
         
-        # Timer for checking music end
+        # Timer for checking music end (and starting the next segment)
         self.check_timer = QTimer()
         self.check_timer.timeout.connect(self.check_music_end)
-        self.check_timer.start(100)  # Check every 100ms
+        self.check_timer.start(20)  # Check every 20ms
         
         # Audio state
-        self.current_sound: Optional[str] = None
+        # Audio of the last generation, owned by the window once finished
+        self.current_audio: Optional[BinaryIO] = None
         self.is_playing = False
+        # Streaming playback: segments downloaded but not played yet
+        self.pending_segments: Deque[bytes] = deque()
+        self.is_generating = False
+        # Incremental synthesis: the last generation's chunks and audio,
+        # for its (lang, tld)
+        self.session = None
+        self.session_key = None
         
         # Create the central widget and layout
         central_widget = QWidget()
@@ -100,19 +270,11 @@ class MainWindow(QMainWindow):
         self.lang_combo = QComboBox()
         self.lang_combo.setFixedWidth(250)  # Set fixed width for language dropdown
         
-        # Get languages with their full names
-        languages = gtts.lang.tts_langs()
-        # Modify Catalan to Catalan-Valencian
-        if 'ca' in languages:
-            languages['ca'] = 'Catalan-Valencian'
-        self.lang_codes = list(languages.keys())
-        lang_names = [f"{lang} ({languages[lang]})" for lang in self.lang_codes]
-        
-        # Add sorted language names to combo box
-        sorted_items = sorted(zip(lang_names, self.lang_codes), key=lambda x: x[0])
-        self.lang_names_to_codes = {name: code for name, code in sorted_items}
-        display_names = [name for name, _ in sorted_items]
-        self.lang_combo.addItems(display_names)
+        # Sorted language display names, from the index gTTS checks against
+        sorted_items = language_items()
+        self.lang_codes = [code for _, code in sorted_items]
+        self.lang_names_to_codes = dict(sorted_items)
+        self.lang_combo.addItems([name for name, _ in sorted_items])
         
         # Get system language
         try:
@@ -148,31 +310,7 @@ class MainWindow(QMainWindow):
             pass
         
         # Language-specific domain mappings
-        self.lang_domains = {
-            'en': {  # English
-                'United States': 'us',
-                'United Kingdom': 'co.uk',
-                'Australia': 'com.au',
-                'Canada': 'ca',
-                'India': 'co.in',
-                'Ireland': 'ie',
-                'South Africa': 'co.za',
-                'Nigeria': 'com.ng'
-            },
-            'es': {  # Spanish
-                'Spain': 'es',
-                'Mexico': 'com.mx',
-                'United States': 'us'
-            },
-            'fr': {  # French
-                'France': 'fr',
-                'Canada': 'ca'
-            },
-            'pt': {  # Portuguese
-                'Portugal': 'pt',
-                'Brazil': 'com.br'
-            }
-        }
+        self.lang_domains = LANG_DOMAINS
         
         # Domain selection
         self.domain_combo = QComboBox()
@@ -194,6 +332,12 @@ class MainWindow(QMainWindow):
         self.about_button = QPushButton(_('About'))
         self.about_button.clicked.connect(self.show_about_dialog)
         lang_layout.addWidget(self.about_button)
+        
+        # Debug button, shows the timings of the last generation
+        self.debug_button = QPushButton(_('Debug'))
+        self.debug_button.setCheckable(True)
+        self.debug_button.toggled.connect(self.toggle_debug_panel)
+        lang_layout.addWidget(self.debug_button)
         layout.addLayout(lang_layout)
         
         # Text input
@@ -213,6 +357,11 @@ class MainWindow(QMainWindow):
         self.start_button.clicked.connect(self.start_speech_generation)
         button_layout.addWidget(self.start_button)
         
+        self.cancel_button = QPushButton(_('Cancel'))
+        self.cancel_button.clicked.connect(self.cancel_speech_generation)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+        
         self.pause_button = QPushButton(_('Pause'))
         self.pause_button.clicked.connect(self.pause_resume_audio)
         self.pause_button.setEnabled(False)
@@ -227,6 +376,37 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(button_layout)
         
+        # Debug panel: metrics of the last generation, hidden by default
+        self.last_metrics: Optional[Metrics] = None
+        self.debug_panel = QWidget()
+        debug_layout = QVBoxLayout(self.debug_panel)
+        debug_layout.setContentsMargins(0, 0, 0, 0)
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel(_('Format:')))
+        self.debug_format_combo = QComboBox()
+        self.debug_format_combo.addItems(['JSON', 'Prometheus'])
+        self.debug_format_combo.currentTextChanged.connect(self.update_debug_panel)
+        format_layout.addWidget(self.debug_format_combo)
+        format_layout.addStretch()
+        debug_layout.addLayout(format_layout)
+        self.debug_text = QPlainTextEdit()
+        self.debug_text.setReadOnly(True)
+        self.debug_text.setPlaceholderText(_('Generate speech to see its timings'))
+        debug_layout.addWidget(self.debug_text)
+        self.debug_panel.setVisible(False)
+        layout.addWidget(self.debug_panel)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.warmed_up:
+            self.warmed_up = True
+            # Once this first paint is done
+            QTimer.singleShot(0, self.warm_up)
+        
+    def warm_up(self):
+        """Load what the first generation needs in the background"""
+        threading.Thread(target=load_engines, daemon=True).start()
+        
     def start_speech_generation(self):
         text = self.text_input.toPlainText()
         if not text:
@@ -234,32 +414,83 @@ class MainWindow(QMainWindow):
             return
             
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Infinite progress
+        self.progress_bar.setRange(0, 0)  # Infinite until the chunk count is known
         self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.save_button.setEnabled(False)
+        
+        # Stop the previous audio, the new one plays as it downloads
+        audio_mixer().music.stop()
+        self.discard_audio()
+        self.pending_segments.clear()
+        self.is_playing = False
+        self.is_generating = True
+        self.pause_button.setEnabled(False)
+        self.pause_button.setText(_('Pause'))
         
         # Create and start the worker thread
-        self.worker = TTSWorker(
-            text=text,
-            lang=self.lang_names_to_codes[self.lang_combo.currentText()],
-            tld=self.lang_domains.get(self.lang_names_to_codes[self.lang_combo.currentText()], {}).get(self.domain_combo.currentText(), 'com')
-        )
+        lang = self.lang_names_to_codes[self.lang_combo.currentText()]
+        tld = self.lang_domains.get(lang, {}).get(self.domain_combo.currentText(), 'com')
+        if (lang, tld) != self.session_key:
+            # Nothing to reuse with another voice
+            self.session = None
+            self.session_key = (lang, tld)
+        self.worker = TTSWorker(text=text, lang=lang, tld=tld, session=self.session)
+        self.worker.segment_ready.connect(self.on_segment_ready)
+        self.worker.progress.connect(self.on_progress)
         self.worker.finished.connect(self.on_speech_generated)
+        self.worker.cancelled.connect(self.on_cancelled)
         self.worker.error.connect(self.on_error)
+        self.last_metrics = self.worker.metrics
         self.worker.start()
         
-    def on_speech_generated(self, file_path: str):
+    def cancel_speech_generation(self):
+        self.cancel_button.setEnabled(False)
+        self.worker.cancel()
+        
+    def on_progress(self, completed: int, total: int, bytes_received: int, latency: float):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(completed)
+        
+    def on_cancelled(self):
+        self.session = self.worker.session
         self.progress_bar.setVisible(False)
         self.start_button.setEnabled(True)
-        self.current_sound = file_path
-        self.pause_button.setEnabled(True)
-        self.save_button.setEnabled(True)
-        
-        # Automatically play the generated audio
-        pygame.mixer.music.load(self.current_sound)
-        pygame.mixer.music.play()
-        pygame.mixer.music.set_endevent(pygame.USEREVENT)
+        self.is_generating = False
+        # The partial audio was discarded
+        audio_mixer().music.stop()
+        self.pending_segments.clear()
+        self.is_playing = False
+        self.pause_button.setEnabled(False)
+        self.pause_button.setText(_('Pause'))
+        self.update_debug_panel()
+        
+    def on_segment_ready(self, segment: bytes):
+        self.pending_segments.append(segment)
+        
+        # First segment (nothing to pause yet), or playback caught up
+        # with the download: play now
+        if not self.pause_button.isEnabled() or (
+                self.is_playing and not audio_mixer().music.get_busy()):
+            self.play_next_segment()
+            self.pause_button.setEnabled(True)
+        
+    def play_next_segment(self):
+        segment = self.pending_segments.popleft()
+        audio_mixer().music.load(BytesIO(segment), 'mp3')
+        audio_mixer().music.play()
         self.is_playing = True
         
+    def on_speech_generated(self, audio: BinaryIO):
+        self.session = self.worker.session
+        self.progress_bar.setVisible(False)
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.current_audio = audio
+        self.save_button.setEnabled(True)
+        self.is_generating = False
+        self.update_debug_panel()
+        
     def update_domains(self, lang_name: str):
         # Clear current items
         self.domain_combo.clear()
@@ -278,34 +509,63 @@ class MainWindow(QMainWindow):
             self.domain_combo.setEnabled(False)
     
     def on_error(self, error_msg: str):
+        # The session still has the last generation that went through
+        self.session = self.worker.session
         self.progress_bar.setVisible(False)
         self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.is_generating = False
+        self.pending_segments.clear()
+        self.update_debug_panel()
         QMessageBox.critical(self, 'Error', f'Failed to generate speech: {error_msg}')
         
     def check_music_end(self):
-        if not pygame.mixer.music.get_busy() and self.is_playing:
-            self.is_playing = False
-            self.pause_button.setEnabled(False)
-            self.pause_button.setText('Pause')
+        if self.is_playing and not audio_mixer().music.get_busy():
+            if self.pending_segments:
+                # Segment boundary: go on with the next one
+                self.play_next_segment()
+            elif not self.is_generating:
+                self.is_playing = False
+                self.pause_button.setEnabled(False)
+                self.pause_button.setText('Pause')
+            # Otherwise, wait for the next segment to download
             
 
         
     def pause_resume_audio(self):
         if self.is_playing:
-            pygame.mixer.music.pause()
+            audio_mixer().music.pause()
             self.is_playing = False
             self.pause_button.setText('Resume')
         else:
-            pygame.mixer.music.unpause()
+            audio_mixer().music.unpause()
             self.is_playing = True
             self.pause_button.setText('Pause')
             
     def show_about_dialog(self):
         dialog = AboutDialog(self)
         dialog.exec()
+        
+    def toggle_debug_panel(self, checked: bool):
+        self.debug_panel.setVisible(checked)
+        self.update_debug_panel()
+        
+    def update_debug_panel(self):
+        """Show the metrics of the last generation, if the panel is open"""
+        if self.last_metrics is None or not self.debug_panel.isVisible():
+            return
+        if self.debug_format_combo.currentText() == 'Prometheus':
+            self.debug_text.setPlainText(self.last_metrics.to_prometheus())
+        else:
+            self.debug_text.setPlainText(self.last_metrics.to_json(indent=2))
     
+    def discard_audio(self):
+        if self.current_audio is not None:
+            self.current_audio.close()
+            self.current_audio = None
+        
     def save_audio(self):
-        if not self.current_sound:
+        if self.current_audio is None:
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
@@ -319,10 +579,10 @@ class MainWindow(QMainWindow):
             if not file_path.endswith('.mp3'):
                 file_path += '.mp3'
             try:
-                source_path = Path(self.current_sound)
-                target_path = Path(file_path)
-                source_path.rename(target_path)
-                self.current_sound = str(target_path)
+                # Copy, so the audio can be saved again (or elsewhere)
+                self.current_audio.seek(0)
+                with open(file_path, 'wb') as f:
+                    shutil.copyfileobj(self.current_audio, f)
                 QMessageBox.information(self, 'Success', 'Audio file saved successfully!')
             except Exception as e:
                 QMessageBox.critical(self, 'Error', f'Failed to save file: {str(e)}')